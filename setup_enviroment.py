@@ -4,64 +4,110 @@ Environment Setup Script for Barcode Generator
 This script helps set up the virtual environment and install dependencies
 """
 
+import hashlib
 import subprocess
 import sys
 import os
 import platform
+import threading
+from pathlib import Path
 
-def run_command(command, description):
-    """Run a command and handle errors"""
-    print(f"\n{'='*50}")
-    print(f"🔄 {description}")
-    print(f"{'='*50}")
-    print(f"Running: {command}")
+# Skip prompts and pip's self-update check, and take wheels over source builds
+PIP_FLAGS = ["--no-input", "--disable-pip-version-check", "--prefer-binary"]
+
+class _Log:
+    """Collects status lines and writes each section to stdout in a single call"""
+    
+    def __init__(self):
+        self.lines = []
+    
+    def __call__(self, text):
+        self.lines.append(f"{text}\n")
+    
+    def flush(self):
+        if self.lines:
+            sys.stdout.write("".join(self.lines))
+            sys.stdout.flush()
+            self.lines.clear()
+
+log = _Log()
+
+def run_command(command, description, timeout=600):
+    """Run a command (argument list, never through a shell) and handle errors"""
+    log(f"\n{'='*50}")
+    log(f"🔄 {description}")
+    log(f"{'='*50}")
+    log(f"Running: {' '.join(command)}")
+    log.flush()
     
     try:
-        if platform.system() == "Windows":
-            result = subprocess.run(command, shell=True, check=True, text=True, capture_output=True)
-        else:
-            result = subprocess.run(command.split(), check=True, text=True, capture_output=True)
-        
-        if result.stdout:
-            print(result.stdout)
-        print(f"✅ {description} - SUCCESS")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} - FAILED")
-        print(f"Error: {e}")
-        if e.stdout:
-            print(f"Output: {e.stdout}")
-        if e.stderr:
-            print(f"Error output: {e.stderr}")
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, bufsize=1)
+    except OSError as e:
+        log(f"❌ {description} - FAILED")
+        log(f"Error: {e}")
+        log.flush()
         return False
+    
+    # Stream output line by line as it arrives instead of buffering it all;
+    # the timer kills the process if it runs past the timeout
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    try:
+        with process:
+            for line in process.stdout:
+                sys.stdout.write(line)
+    finally:
+        timed_out = not timer.is_alive()
+        timer.cancel()
+    
+    if timed_out:
+        log(f"❌ {description} - TIMED OUT after {timeout}s")
+        return False
+    if process.returncode != 0:
+        log(f"❌ {description} - FAILED")
+        log(f"Error: exit status {process.returncode}")
+        return False
+    
+    log(f"✅ {description} - SUCCESS")
+    return True
 
 def check_python_version():
     """Check if Python version is compatible"""
     version = sys.version_info
     if version.major >= 3 and version.minor >= 8:
-        print(f"✅ Python {version.major}.{version.minor}.{version.micro} - Compatible")
+        log(f"✅ Python {version.major}.{version.minor}.{version.micro} - Compatible")
         return True
     else:
-        print(f"❌ Python {version.major}.{version.minor}.{version.micro} - Need Python 3.8+")
+        log(f"❌ Python {version.major}.{version.minor}.{version.micro} - Need Python 3.8+")
+        return False
+
+def provision_environment(venv_name, python_cmd, pip_cmd, install_args, install_description):
+    """Create the virtual environment, upgrade pip and install the packages"""
+    if not run_command([sys.executable, "-m", "venv", venv_name], 
+                      f"Creating virtual environment '{venv_name}'"):
+        return False
+    
+    # Upgrade pip in virtual environment
+    if not run_command([python_cmd, "-m", "pip", "install", *PIP_FLAGS, "--upgrade", "pip"], 
+                      "Upgrading pip in virtual environment"):
         return False
+    
+    # Install all packages in one pip run
+    return run_command([pip_cmd, "install", *PIP_FLAGS, *install_args], install_description)
 
 def setup_virtual_environment():
     """Set up the virtual environment"""
-    print("🚀 Starting Barcode Generator Environment Setup")
-    print("=" * 60)
+    log("🚀 Starting Barcode Generator Environment Setup")
+    log("=" * 60)
     
     # Check Python version
     if not check_python_version():
-        print("Please upgrade Python to version 3.8 or higher")
+        log("Please upgrade Python to version 3.8 or higher")
         return False
     
-    # Create virtual environment
     venv_name = "barcode_env"
     
-    if not run_command(f"{sys.executable} -m venv {venv_name}", 
-                      f"Creating virtual environment '{venv_name}'"):
-        return False
-    
     # Determine activation command based on OS
     if platform.system() == "Windows":
         activate_cmd = f"{venv_name}\\Scripts\\activate"
@@ -72,49 +118,51 @@ def setup_virtual_environment():
         pip_cmd = f"{venv_name}/bin/pip"
         python_cmd = f"{venv_name}/bin/python"
     
-    # Upgrade pip in virtual environment
-    if not run_command(f"{python_cmd} -m pip install --upgrade pip", 
-                      "Upgrading pip in virtual environment"):
-        return False
-    
-    # Install requirements
-    if os.path.exists("requirements.txt"):
-        if not run_command(f"{pip_cmd} install -r requirements.txt", 
-                          "Installing requirements from requirements.txt"):
-            return False
+    # Install from requirements.txt, or the core packages if it doesn't exist
+    if Path("requirements.txt").is_file():
+        install_args = ["-r", "requirements.txt"]
+        install_description = "Installing requirements from requirements.txt"
+        spec = Path("requirements.txt").read_bytes()
     else:
-        # Install packages individually if requirements.txt doesn't exist
         packages = [
             "pandas>=1.5.0",
             "Pillow>=9.0.0",
-            "qrcode[pil]>=7.4.2",
-            "python-barcode>=0.14.0"
+            "segno>=1.5.0",
+            "numpy>=1.21.0"
         ]
-        
-        for package in packages:
-            if not run_command(f"{pip_cmd} install {package}", 
-                              f"Installing {package}"):
-                return False
+        install_args = packages
+        install_description = f"Installing {', '.join(packages)}"
+        spec = "\n".join(packages).encode()
+    
+    # Re-runs are a no-op while the venv was provisioned by this Python from the same spec
+    marker = Path(venv_name) / ".provisioned"
+    fingerprint = hashlib.sha256(sys.version.encode() + b"\0" + spec).hexdigest()
+    if marker.is_file() and marker.read_text() == fingerprint:
+        log(f"✅ Virtual environment '{venv_name}' is already up to date - skipping install")
+    elif provision_environment(venv_name, python_cmd, pip_cmd, install_args, install_description):
+        marker.write_text(fingerprint)
+    else:
+        return False
     
     # Show success message
-    print(f"\n{'='*60}")
-    print("🎉 SETUP COMPLETE!")
-    print(f"{'='*60}")
-    print(f"Virtual environment '{venv_name}' is ready!")
-    print("\nTo activate the environment:")
+    log(f"\n{'='*60}")
+    log("🎉 SETUP COMPLETE!")
+    log(f"{'='*60}")
+    log(f"Virtual environment '{venv_name}' is ready!")
+    log("\nTo activate the environment:")
     
     if platform.system() == "Windows":
-        print(f"   {venv_name}\\Scripts\\activate")
-        print("   Or simply: activate_env.bat")
+        log(f"   {venv_name}\\Scripts\\activate")
+        log("   Or simply: activate_env.bat")
     else:
-        print(f"   source {venv_name}/bin/activate")
-        print("   Or simply: source activate_env.sh")
+        log(f"   source {venv_name}/bin/activate")
+        log("   Or simply: source activate_env.sh")
     
-    print("\nTo deactivate when done:")
-    print("   deactivate")
+    log("\nTo deactivate when done:")
+    log("   deactivate")
     
-    print(f"\nTo run the barcode generator:")
-    print(f"   {python_cmd} barcode_generator.py")
+    log(f"\nTo run the barcode generator:")
+    log(f"   {python_cmd} barcode_generator.py")
     
     # Create activation scripts
     create_activation_scripts(venv_name)
@@ -134,7 +182,7 @@ cmd /k
 """
         with open("activate_env.bat", "w") as f:
             f.write(batch_content)
-        print("✅ Created activate_env.bat for easy activation")
+        log("✅ Created activate_env.bat for easy activation")
     
     else:
         # Unix shell script
@@ -147,30 +195,36 @@ exec "$SHELL"
         with open("activate_env.sh", "w") as f:
             f.write(shell_content)
         os.chmod("activate_env.sh", 0o755)
-        print("✅ Created activate_env.sh for easy activation")
+        log("✅ Created activate_env.sh for easy activation")
 
 def main():
     """Main setup function"""
+    # The status lines use emoji, which legacy Windows console encodings can't print
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    
     try:
         success = setup_virtual_environment()
         if success:
-            print(f"\n{'='*60}")
-            print("📋 NEXT STEPS:")
-            print(f"{'='*60}")
-            print("1. Activate the virtual environment")
-            print("2. Run the barcode generator script")
-            print("3. Check the generated_barcodes folder for output")
-            print("\nHappy barcode generating! 📊")
+            log(f"\n{'='*60}")
+            log("📋 NEXT STEPS:")
+            log(f"{'='*60}")
+            log("1. Activate the virtual environment")
+            log("2. Run the barcode generator script")
+            log("3. Check the generated_barcodes folder for output")
+            log("\nHappy barcode generating! 📊")
         else:
-            print("\n❌ Setup failed. Please check the errors above.")
+            log("\n❌ Setup failed. Please check the errors above.")
             sys.exit(1)
     
     except KeyboardInterrupt:
-        print("\n\n⚠️  Setup interrupted by user.")
+        log("\n\n⚠️  Setup interrupted by user.")
         sys.exit(1)
     except Exception as e:
-        print(f"\n❌ Unexpected error during setup: {e}")
+        log(f"\n❌ Unexpected error during setup: {e}")
         sys.exit(1)
+    finally:
+        log.flush()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for the label rendering helpers in main.py
+"""
+
+import os
+import random
+
+import numpy as np
+from PIL import Image, ImageDraw
+import segno
+
+import main
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ARIALBD.TTF")
+
+def test_draw_text_matches_imagedraw():
+    """Cached glyph drawing produces exactly the pixels ImageDraw.text() does"""
+    rng = random.Random(0)
+    alphabet = "0123456789 ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz/:.-"
+    for _ in range(500):
+        font = main._ttf(FONT_PATH, rng.choice((18, 20, 25, 28, 30, 35)))
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 16)))
+        xy = (rng.uniform(0, 40), rng.uniform(0, 40))
+
+        expected = Image.new('L', (650, 120), 'white')
+        ImageDraw.Draw(expected).text(xy, text, fill='black', font=font)
+        actual = Image.new('L', (650, 120), 'white')
+        main._draw_text(actual, xy, text, font)
+
+        assert np.array_equal(np.asarray(actual), np.asarray(expected)), (text, xy, font.size)
+
+def test_draw_text_label_prefixes():
+    """Label prefixes with blank glyphs draw on the cached path"""
+    font = main._ttf(FONT_PATH, 20)
+    for text in ("Box ID", "D/N: M8N7", "IMEI", " "):
+        expected = Image.new('L', (200, 40), 'white')
+        ImageDraw.Draw(expected).text((3, 5), text, fill='black', font=font)
+        actual = Image.new('L', (200, 40), 'white')
+        main._draw_text(actual, (3, 5), text, font)
+        assert np.array_equal(np.asarray(actual), np.asarray(expected)), text
+
+def _decode_code128(modules):
+    """Decode a Code128 module row back to its data, checking checksum and stop pattern"""
+    modules = bytes(modules)
+    assert modules[-13:] == main._CODE128_STOP
+    symbols = [main._CODE128_PATTERNS.index(modules[i:i + 11]) for i in range(0, len(modules) - 13, 11)]
+    *symbols, checksum = symbols
+    assert checksum == (symbols[0] + sum(i * symbol for i, symbol in enumerate(symbols))) % 103
+
+    start, *symbols = symbols
+    charset = {main._CODE128_START_B: 'B', main._CODE128_START_C: 'C'}[start]
+    data = ""
+    for symbol in symbols:
+        if charset == 'C' and symbol == main._CODE128_TO_B:
+            charset = 'B'
+        elif charset == 'B' and symbol == main._CODE128_TO_C:
+            charset = 'C'
+        elif charset == 'C':
+            data += f"{symbol:02d}"
+        else:
+            data += chr(symbol + 32)
+    return data
+
+def test_code128_round_trip():
+    """Every encoded module row decodes back to the input"""
+    rng = random.Random(0)
+    printable = "".join(chr(c) for c in range(32, 127))
+    cases = ["998", "99", "9", "359827134443046", "M8N7", "AB12345CD", "12a3456"]
+    for _ in range(5000):
+        length = rng.randint(1, 20)
+        alphabet = rng.choice(("0123456789", "0123456789" * 4 + "AB -", printable))
+        cases.append("".join(rng.choice(alphabet) for _ in range(length)))
+
+    for data in cases:
+        assert _decode_code128(main._code128_modules(data)) == data, data
+
+def test_qr_matrix_is_a_segno_symbol():
+    """The mask swapped in place yields exactly segno's symbol for one of the 8 masks"""
+    rng = random.Random(0)
+    alphabets = ("0123456789", "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:",
+                 "".join(chr(c) for c in range(32, 127)))
+    cases = ["359827134443046", "355760833587361", "A" * 300]
+    for _ in range(500):
+        alphabet = rng.choice(alphabets)
+        # Up to ~150 characters also covers versions 7+, which carry version information
+        cases.append("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 150))))
+
+    for data in cases:
+        matrix = main._qr_matrix(data)
+        assert any(
+            np.array_equal(matrix, np.array(segno.make_qr(data, error='l', mask=mask, boost_error=False).matrix))
+            for mask in range(8)
+        ), data
+
+def _reference_penalty(symbol):
+    """ISO/IEC 18004 mask penalty (N1-N4) of one symbol, module by module"""
+    width = len(symbol)
+    lines = [list(row) for row in symbol] + [list(column) for column in zip(*symbol)]
+    score = 0
+
+    # N1: each run of 5+ same-color modules in a row or column
+    for line in lines:
+        run = 1
+        for previous, module in zip(line, line[1:] + [None]):
+            if module == previous:
+                run += 1
+                continue
+            if run >= 5:
+                score += run - 2
+            run = 1
+
+    # N2: each 2x2 block of one color
+    for i in range(width - 1):
+        for j in range(width - 1):
+            if symbol[i][j] == symbol[i + 1][j] == symbol[i][j + 1] == symbol[i + 1][j + 1]:
+                score += 3
+
+    # N3: 1011101 with 4 light modules (or the symbol edge) before or after it
+    for line in lines:
+        for start in range(width - 6):
+            if line[start:start + 7] != [1, 0, 1, 1, 1, 0, 1]:
+                continue
+            if not any(line[max(0, start - 4):start]) or not any(line[start + 7:start + 11]):
+                score += 40
+
+    # N4: each full 5% the dark proportion deviates from 50%
+    dark_percent = sum(map(sum, symbol)) * 100 / (width * width)
+    score += 10 * int(abs(dark_percent - 50) // 5)
+    return score
+
+def test_qr_penalties_match_reference():
+    """Vectorized mask scoring equals the per-module ISO rules"""
+    rng = np.random.default_rng(0)
+    finder_like = np.array([1, 0, 1, 1, 1, 0, 1], dtype=np.uint8)
+    for width in (21, 25, 29, 45):
+        for _ in range(10):
+            symbols = (rng.random((8, width, width)) < rng.uniform(0.2, 0.8)).astype(np.uint8)
+            # Random data rarely forms finder-like runs, so plant some with light
+            # sides in rows and (through the transposed view) columns
+            for symbol in symbols:
+                for k in range(rng.integers(0, 6)):
+                    target = symbol.T if k % 2 else symbol
+                    i, j = rng.integers(0, width), rng.integers(0, width - 6)
+                    target[i, max(0, j - 4):j] = 0
+                    target[i, j:j + 7] = finder_like
+            expected = [_reference_penalty(symbol.tolist()) for symbol in symbols]
+            assert main._qr_penalties(symbols).tolist() == expected, width